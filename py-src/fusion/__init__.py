@@ -8,7 +8,8 @@ from fusion.loop import MainLoop, NoMainLoop
 __version__ = importlib.metadata.version('python-fusion')
 
 from .logging import get_logger
-from fusion.libs.entity import entity_type, Entity
+from fusion.libs.entity import entity_type, Entity, \
+    set_reproducible_entity_ids
 from fusion.libs.entity.change import Change, ChangeTypes
 # from fusion.state_manager import FusionStateManager
 from fusion.loop import main_loop, set_main_loop
@@ -65,6 +66,7 @@ def set_reproducible_ids(enabled: bool):
     else:
         random.seed(time.time())
         _reproducible_ids = False
+    set_reproducible_entity_ids(_reproducible_ids)
 
 
 def reproducible_ids():
@@ -1,5 +1,4 @@
-from ast import Dict
-from typing import List
+from typing import Any, Callable, Dict, List
 from fusion.libs.entity.change import Change
 from fusion.logging import get_logger
 
@@ -16,7 +15,9 @@ class AggregatorSlot:
     def is_compound(self):
         return len(self.changes) > 1
 
-    def aggregated(self) -> Change:
+    def aggregated(self) -> Change | None:
+        """Reduce the changes to a single one. Returns None if the entity was
+        created and deleted in the slot window."""
         if not self.is_compound():
             return self.changes[0]
 
@@ -53,7 +54,7 @@ class AggregatorSlot:
                     update_last_state = last_state
             else:  # Change is delete
                 if added:
-                    removed = added
+                    # Created and deleted in the same window - cancel out
                     added = None
                 elif update_old_state:
                     removed = update_old_state
@@ -66,13 +67,15 @@ class AggregatorSlot:
             raise Exception
 
         if added:
-            return Change.CREATE(added)
+            return Change.CREATE(added, copy_states=False)
         elif update_last_state:
             if not update_old_state:
                 raise Exception
-            return Change.UPDATE(update_old_state, update_last_state)
+            return Change.UPDATE(update_old_state, update_last_state,
+                                 copy_states=False)
         elif removed:
-            return Change.DELETE(removed)
+            return Change.DELETE(removed, copy_states=False)
+        return None
 
 
 class ChangeAggregator:
@@ -82,15 +85,22 @@ class ChangeAggregator:
     to the output_channel or changeset_output_channel (or both if set).
     The difference between the latter two is that on the changeset channel
     all of the changes are sent as a list as a single message.
+
+    The changes are merged per slot_key (by default the identity of the last
+    state object), so e.g. multiple updates of a state between releases
+    result in a single UPDATE change with the latest state. A CREATE and a
+    DELETE in the same window cancel out - nothing is pushed for that slot.
     """
     def __init__(
             self,
             input_channel,
             release_trigger_channel,
             output_channel=None,
-            changeset_output_channel=None):
+            changeset_output_channel=None,
+            slot_key: Callable[[Change], Any] = None):
 
-        self.slots: Dict[str, AggregatorSlot] = {}
+        self.slots: Dict[Any, AggregatorSlot] = {}
+        self.slot_key = slot_key or (lambda change: id(change.last_state()))
         self.added = {}
         self.update_old_states = {}
         self.update_last_states = {}
@@ -114,16 +124,19 @@ class ChangeAggregator:
         """Parses the recieved changes and reduces them to a single change per
         view state (identified by its id).
         """
-        state = change.last_state()
-        if id(state) in self.slots:
-            self.slots[id(state)].add_change(change)
+        key = self.slot_key(change)
+        slot = self.slots.get(key)
+        if slot:
+            slot.add_change(change)
         else:
-            self.slots[id(state)] = AggregatorSlot(change)
+            self.slots[key] = AggregatorSlot(change)
 
     def release_aggregated_changes(self, completed_actions):
         changes = []
         for slot in self.slots.values():
-            changes.append(slot.aggregated())
+            change = slot.aggregated()
+            if change:
+                changes.append(change)
         self.slots.clear()
 
         if not changes:
@@ -133,8 +146,7 @@ class ChangeAggregator:
         log.info('RELEASE_AGGREGATED_CHANGES:')
 
         if self.output_channel:
-            for change in changes:
-                self.output_channel.push(change)
+            self.output_channel.push_many(changes)
 
         if self.changeset_output_channel:
             self.changeset_output_channel.push(changes)
@@ -44,14 +44,19 @@ def handle_state_change(change):
 
 parent_state = create_view_state()
 subscription = fsm.state_changes_per_TLA_by_view_id.subscribe(
-    handle_state_change, index_val=parent_state.id)
+    handle_state_change, index_val=parent_state.view_id)
 ```
 """
+import sys
+import weakref
+
 import fusion
 from fusion.libs.entity.change import Change
 from fusion.change_aggregator import ChangeAggregator
 from fusion.libs.channel import Channel
-from fusion.libs.action import completed_root_actions, ensure_context, execute_action
+from fusion.libs.action import (NOT_IN_ACTION_ERROR_MESSAGE,
+                                _action_context_stack, completed_root_actions,
+                                execute_action, on_root_action_exit)
 from fusion.libs.state import ViewState
 
 log = fusion.get_logger(__name__)
@@ -65,8 +70,27 @@ actions_queue_channel.subscribe(execute_action)
 
 _state_aggregator = None
 
-_view_states = {}
-_state_backups = {}
+
+class _Entry:
+    """The current view state and its backup (the last pushed snapshot), kept
+    together so that the mutation functions need a single dict lookup."""
+    __slots__ = ('current', 'backup')
+
+    def __init__(self, current: ViewState, backup: ViewState):
+        self.current = current
+        self.backup = backup
+
+
+_entries = {}  # _Entry objects by view_id
+# Views may still access their state after it's removed (before getting
+# destroyed). So on removal the backup is kept if there's a live view for the
+# state, and released when the view gets garbage collected (or destroyed)
+_views = weakref.WeakValueDictionary()  # View objects by view_id
+_removed_state_backups = {}
+
+# The raw changes are buffered during the root action and pushed as a batch
+# when it exits
+_pending_changes = []
 
 _last_view_id = 0
 
@@ -76,75 +100,159 @@ def setup():
     _state_aggregator = ChangeAggregator(
         input_channel=raw_state_changes,
         release_trigger_channel=completed_root_actions,
-        output_channel=state_changes_per_TLA_by_view_id)
+        output_channel=state_changes_per_TLA_by_view_id,
+        slot_key=lambda change: change.last_state().view_id)
 
 
-setup()
+def _flush_pending_changes(root_action=None):
+    global _pending_changes
+    if not _pending_changes:
+        return
+
+    # The aggregator is set up on the first flush, so that apps which never
+    # change view states don't pay for it
+    if _state_aggregator is None:
+        setup()
+
+    changes, _pending_changes = _pending_changes, []
+    raw_state_changes.push_many(changes)
+
+
+on_root_action_exit(_flush_pending_changes)
 
 
 def reset():
-    global _last_view_id
-    _view_states.clear()
-    _state_backups.clear()
+    global _last_view_id, _state_aggregator
+    _entries.clear()
+    _pending_changes.clear()
+    _removed_state_backups.clear()
+    _views.clear()
     _last_view_id = 0
-    setup()
+
+    if _state_aggregator is not None:
+        _state_aggregator.raw_sub_id.unsubscribe()
+        _state_aggregator.actions_sub_id.unsubscribe()
+        _state_aggregator = None
 
 
 def get_view_id():
     global _last_view_id
     _last_view_id += 1
-    return str(_last_view_id)
+    # Interned, since view ids are used as keys in most fsm/channel lookups
+    return sys.intern(str(_last_view_id))
 
 
+# The state mutation functions below (add_state, update_state and
+# remove_state) are called very often, so they check for an action context
+# inline instead of calling ensure_context()
 @log.traced
 def add_state(state_: ViewState):
-    ensure_context()
-    if state_.view_id in _view_states:
-        raise Exception(
-            f'View state with id {state_.view_id} already present.')
+    if not _action_context_stack:
+        raise Exception(NOT_IN_ACTION_ERROR_MESSAGE)
+    view_id = state_.view_id
+    if view_id in _entries:
+        raise Exception(f'View state with id {view_id} already present.')
     state_._added = True
-    _view_states[state_.view_id] = state_
-    _state_backups[state_.view_id] = state_.copy()
-    change = Change.CREATE(state_)
-    raw_state_changes.push(change)
+    # The backup doubles as the (immutable) snapshot in the change
+    backup = state_.copy()
+    _entries[view_id] = _Entry(state_, backup)
+    change = Change.CREATE(backup, copy_states=False)
+    _pending_changes.append(change)
     return change
 
 
 def view_state_exists(view_id: str) -> bool:
-    return view_id in _view_states
+    return view_id in _entries
 
 
 def view_state(view_id):
-    return _view_states[view_id]
+    return _entries[view_id].current
+
+
+def get_view_state_or_backup(view_id: str) -> ViewState:
+    """Returns the current state, or the last backup if the state has been
+    removed (e.g. for views that haven't been destroyed yet)."""
+    entry = _entries.get(view_id)
+    if entry:
+        return entry.current
+    return _removed_state_backups[view_id]
 
 
 def get_state_backup(view_id: str):
-    return _state_backups[view_id]
+    entry = _entries.get(view_id)
+    if entry:
+        return entry.backup
+    return _removed_state_backups[view_id]
+
+
+def register_view(view):
+    """Called by the View constructor. The backup of the state is kept after
+    its removal for as long as the view is alive."""
+    view_id = view.view_id
+    _views[view_id] = view
+    weakref.finalize(view, _release_backup_if_unused, view_id)
+
+
+def _release_backup_if_unused(view_id: str):
+    # Another view may have been registered for the same state
+    if view_id not in _views:
+        _removed_state_backups.pop(view_id, None)
+
+
+def release_state_backup(view_id: str):
+    """Drop the backup of a removed state (e.g. when the view for it gets
+    destroyed before being garbage collected)."""
+    _removed_state_backups.pop(view_id, None)
 
 
 @log.traced
 def update_state(state_: ViewState):
-    ensure_context()
-    if state_.view_id not in _view_states:
+    """Push the changes made to the view state.
+
+    Returns the resulting change. If no field has changed since the last
+    update, nothing is pushed and None is returned.
+    """
+    if not _action_context_stack:
+        raise Exception(NOT_IN_ACTION_ERROR_MESSAGE)
+    entry = _entries.get(state_.view_id)
+    if entry is None:
         raise Exception('Cannot update a state which has not been added.')
 
-    change = Change.UPDATE(_state_backups[state_.view_id], state_)
-    raw_state_changes.push(change)
-
-    if (state_._version + 1) <= _view_states[state_.view_id]._version:
+    if (state_._version + 1) <= entry.current._version:
         raise Exception('You\'re using an old state. This object has '
                         'already been updated')
 
-    _state_backups[state_.view_id] = state_.copy()
+    # Skip the copy and the change propagation for no-op updates
+    backup = entry.backup
+    # Strict, since entity field values with equal ids may still differ
+    delta = state_.delta_from(backup, strict=True)
+    if not delta:
+        return None
+
+    # Build the new backup from the previous one, so that only the changed
+    # fields get copied
+    new_backup = backup.snapshot_with_changes(delta)
+    change = Change.UPDATE(backup, new_backup, copy_states=False)
+    _pending_changes.append(change)
+
+    entry.backup = new_backup
     state_._version += 1
-    _view_states[state_.view_id] = state_
+    entry.current = state_
     return change
 
 
 @log.traced
 def remove_state(state_: ViewState):
-    ensure_context()
-    state_ = _view_states.pop(state_.view_id)
-    change = Change.DELETE(state_)
-    raw_state_changes.push(change)
+    if not _action_context_stack:
+        raise Exception(NOT_IN_ACTION_ERROR_MESSAGE)
+    view_id = state_.view_id
+    entry = _entries.pop(view_id, None)
+    if entry is None:
+        raise Exception('Cannot remove a state which has not been added.')
+
+    backup = entry.backup
+    if view_id in _views:
+        _removed_state_backups[view_id] = backup
+    change = Change.DELETE(backup, copy_states=False)
+    _pending_changes.append(change)
     return change
@@ -2,13 +2,15 @@ from contextlib import contextmanager
 import threading
 import time
 import functools
+import logging
 import traceback
 from typing import Callable
 
 import fusion
 from fusion.libs.action.action_call import ActionCall, ActionRunStates
 from fusion.libs.channel import Channel, Subscription
-from fusion.logging import LOGGING_LEVEL, BColors, LoggingLevels
+from fusion.logging import LOGGING_LEVEL, BColors, LoggingLevels, \
+    indent_for_depth
 
 log = fusion.get_logger(__name__)
 
@@ -21,8 +23,10 @@ completed_root_actions = Channel('__COMPLETED_ROOT_ACTIONS__')
 actions_log_channel = Channel('__ACTIONS_LOG__')
 
 _action_context_stack = []
+_root_action_exit_hooks = []
 
 _view_and_parent_update_ongoing = False
+_main_thread_ident = threading.main_thread().ident
 
 
 def unwrapped_action_by_name(action_name: str):
@@ -49,14 +53,27 @@ def view_and_parent_update_ongoing():
     return _view_and_parent_update_ongoing
 
 
+def on_root_action_exit(hook: Callable):
+    """Register a callable to be invoked synchronously with the action as an
+    argument when a root action exits (before pushing it on the
+    completed_root_actions channel). Used by the state manager to flush
+    the buffered state changes."""
+    _root_action_exit_hooks.append(hook)
+
+
 @contextmanager
 def action_context(action):
     _action_context_stack.append(action)
     yield None
+    _exit_action_context(action)
 
+
+def _exit_action_context(action):
     # If it's a root action - propagate the state changes to the views (async)
     _action_context_stack.pop()
     if not _action_context_stack:
+        for hook in _root_action_exit_hooks:
+            hook(action)
         completed_root_actions.push(action)
 
 
@@ -64,11 +81,14 @@ def is_in_action():
     return bool(_action_context_stack)
 
 
+NOT_IN_ACTION_ERROR_MESSAGE = (
+    'State changes can only happen in functions decorated with the '
+    'fusion.libs.action.action decorator')
+
+
 def ensure_context():
-    if not is_in_action():
-        raise Exception(
-            'State changes can only happen in functions decorated with the '
-            'fusion.gui.action.action decorator')
+    if not _action_context_stack:
+        raise Exception(NOT_IN_ACTION_ERROR_MESSAGE)
 
 
 # Action channel interface
@@ -76,22 +96,29 @@ def log_action_call(action_call: ActionCall):
     """Push an action to the actions channel and handle logging. Should only be
     called by the action decorator.
     """
-    args_str = ', '.join([str(a) for a in action_call.args])
-    kwargs_str = ', '.join(
-        ['%s=%s' % (k, v) for k, v in action_call.kwargs.items()])
+    log_enabled = log.is_enabled_for(logging.INFO)
+    if not log_enabled and not actions_log_channel.subscriptions:
+        return
+
+    if log_enabled:
+        args_str = ', '.join([str(a) for a in action_call.args])
+        kwargs_str = ', '.join(
+            ['%s=%s' % (k, v) for k, v in action_call.kwargs.items()])
 
-    indent = '.' * 4 * (len(_action_context_stack) - 1)
+        indent = indent_for_depth(max(len(_action_context_stack) - 1, 0))
 
-    green = BColors.OKGREEN
-    end = BColors.ENDC
-    msg = (f'{indent}Action {green}{action_call.run_state.name} '
-           f'{action_call.name}{end} '
-           f'ARGS=*({args_str}) KWARGS=**{{{kwargs_str}}}')
-    if action_call.duration != -1:
-        msg += f' time={action_call.duration * 1000:.2f}ms'
-    log.info(msg)
+        green = BColors.OKGREEN
+        end = BColors.ENDC
+        msg = (f'{indent}Action {green}{action_call.run_state.name} '
+               f'{action_call.name}{end} '
+               f'ARGS=*({args_str}) KWARGS=**{{{kwargs_str}}}')
+        if action_call.duration != -1:
+            msg += f' time={action_call.duration * 1000:.2f}ms'
+        log.info(msg)
 
-    actions_log_channel.push(action_call.copy())
+    # Copying is only needed if someone listens (e.g. for recording)
+    if actions_log_channel.subscriptions:
+        actions_log_channel.push(action_call.copy())
 
 
 def on_actions_logged(handler: Callable) -> Subscription:
@@ -114,23 +141,25 @@ def execute_action(_action):
     # only after the completion of the top-level(=root) action.
     # That way redundant GUI rendering is avoided inside an action that
     # makes multiple update_state calls and/or invokes other actions
-    _action.is_top_level = not is_in_action()
-    with action_context(_action):
-        # Call the actual function
-        try:
-            return_val = _action.function(*_action.args, **_action.kwargs)
-            _action.run_state = ActionRunStates.FINISHED
+    # (action_context is inlined here, since it's called for every action)
+    _action.is_top_level = not _action_context_stack
+    _action_context_stack.append(_action)
+    # Call the actual function
+    try:
+        return_val = _action.function(*_action.args, **_action.kwargs)
+        _action.run_state = ActionRunStates.FINISHED
+        _action.duration = time.time() - _action.start_time
+    except Exception as e:
+        if LOGGING_LEVEL == LoggingLevels.DEBUG.value:
+            raise e
+        else:
             _action.duration = time.time() - _action.start_time
-        except Exception as e:
-            if LOGGING_LEVEL == LoggingLevels.DEBUG.value:
-                raise e
-            else:
-                _action.duration = time.time() - _action.start_time
-                _action.error = (str(e) + '\n\nTraceback:\n' +
-                                 traceback.format_exc())
+            _action.error = (str(e) + '\n\nTraceback:\n' +
+                             traceback.format_exc())
 
-                return_val = None
-                _action.run_state = ActionRunStates.FAILED
+            return_val = None
+            _action.run_state = ActionRunStates.FAILED
+    _exit_action_context(_action)
 
     log_action_call(_action)
 
@@ -158,17 +187,17 @@ def action(name: str, issuer: str = 'user'):
 
         @functools.wraps(func)
         def wrapper_action(*args, **kwargs):
-            _action = ActionCall(name,
-                                 issuer=issuer,
-                                 args=list(args),
-                                 kwargs=kwargs)
+            _action = ActionCall.for_wrapper(name,
+                                             issuer=issuer,
+                                             args=args,
+                                             kwargs=kwargs)
 
             if fusion.libs.action.view_and_parent_update_ongoing():
                 raise Exception(
                     'Cannot invoke an action while updating the views.')
 
             # If we're not on the main thread - queue the action
-            if threading.current_thread() != threading.main_thread():
+            if threading.get_ident() != _main_thread_ident:
                 if is_in_action():
                     raise Exception(
                         'It should not be possible to invoke a nested action'
@@ -1,6 +1,5 @@
-from copy import copy
 import time
-from typing import Union, Callable
+from typing import Sequence, Union, Callable
 from enum import Enum
 
 from fusion.util import get_new_id
@@ -18,12 +17,15 @@ class ActionCall:
     """Mostly functions as a data class to carry the action state, args, kwargs
      and profiling info.
     """
+    __slots__ = ('name', 'issuer', 'run_state', 'is_top_level', 'error',
+                 'args', 'kwargs', 'id', 'start_time', 'duration',
+                 '_function', '_function_name')
 
     def __init__(self,
                  name: str,
                  issuer: str,
                  run_state: Union[ActionRunStates, str] = ActionRunStates.NONE,
-                 args: list = None,
+                 args: Sequence = None,
                  kwargs: dict = None,
                  id: str = None,
                  start_time: float = None,
@@ -39,23 +41,49 @@ class ActionCall:
         self.is_top_level: bool = is_top_level
         self.error = error
 
-        self.args = args or []
-        if not isinstance(self.args, list):
-            self.args = list(self.args)
+        self.args = args if args is not None else ()
 
         self.kwargs = kwargs or {}
 
         self.id = id or get_new_id()
         self.start_time = start_time if start_time is not None else time.time()
         self.duration = duration
-        if function and isinstance(function, str):
-            function = libs.action.unwrapped_action_by_name(function)
-        self._function = function
+        # Action names are resolved on first access of the function property
+        if isinstance(function, str):
+            self._function = None
+            self._function_name = function
+        else:
+            self._function = function
+            self._function_name = None
+
+    @classmethod
+    def for_wrapper(cls,
+                    name: str,
+                    issuer: str,
+                    args: Sequence,
+                    kwargs: dict) -> 'ActionCall':
+        """Fast constructor used by the action decorator on each invocation.
+        Skips the argument normalization done in __init__."""
+        self = object.__new__(cls)
+        self.name = name
+        self.issuer = issuer
+        self.run_state = ActionRunStates.NONE
+        self.is_top_level = None
+        self.error = ''
+        self.args = args
+        self.kwargs = kwargs
+        self.id = get_new_id()
+        self.start_time = time.time()
+        self.duration = -1
+        self._function = None
+        self._function_name = None
+        return self
 
     @property
     def function(self):
         if not self._function:
-            self._function = libs.action.unwrapped_action_by_name(self.name)
+            self._function = libs.action.unwrapped_action_by_name(
+                self._function_name or self.name)
 
         return self._function
 
@@ -72,11 +100,21 @@ class ActionCall:
             string += f'duration={self.duration:.2f}'
         return string + '>'
 
+    def __copy__(self) -> 'ActionCall':
+        # A shallow copy of the attributes, without the round trip through
+        # asdict() and __init__ (run_state parsing, id generation)
+        new = object.__new__(ActionCall)
+        for attr in ActionCall.__slots__:
+            setattr(new, attr, getattr(self, attr))
+        return new
+
     def copy(self) -> 'ActionCall':
-        return ActionCall(**self.asdict())
+        return self.__copy__()
 
     def asdict(self) -> dict:
-        self_dict = copy(vars(self))
+        self_dict = {attr: getattr(self, attr)
+                     for attr in ActionCall.__slots__
+                     if attr not in ('_function', '_function_name')}
         self_dict['run_state'] = self.run_state.name
-        self_dict.pop('_function')
+        self_dict['args'] = list(self.args)
         return self_dict
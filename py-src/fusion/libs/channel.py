@@ -6,8 +6,11 @@ it's expected that the subscribed callables are light, since the main purpose
 of fusion is GUI rendering and blocking the main loop would cause freezing.
 """
 
+import itertools
+import threading
+from operator import attrgetter
 from typing import Callable, Dict, Any
-from collections import defaultdict
+from collections import deque
 from dataclasses import MISSING
 
 import fusion
@@ -17,20 +20,63 @@ log = get_logger(__name__)
 
 _channels = {}
 
+# Subscriptions get sequence numbers when added, so that the handlers for a
+# message are invoked in subscription order
+_subscription_counter = itertools.count()
+_subscription_order = attrgetter('order')
+
+
+def _in_subscription_order(subs: tuple, other_subs: tuple) -> list:
+    return sorted(subs + other_subs, key=_subscription_order)
+
+# (handler, message) pairs for all channels, invoked in FIFO order by a single
+# delayed call to _flush_pending (instead of one delayed call per handler)
+_pending = deque()
+# The main loop on which a flush is scheduled (None if there's no pending
+# flush). If the main loop gets swapped - the flush is rescheduled on the new
+# one, since the old loop may never get to run it
+_flush_scheduled_on = None
+
+
+def _schedule_flush():
+    global _flush_scheduled_on
+    main_loop = fusion.main_loop()
+    if _flush_scheduled_on is not main_loop:
+        _flush_scheduled_on = main_loop
+        main_loop.call_delayed(_flush_pending, 0)
+
+
+def _flush_pending():
+    global _flush_scheduled_on
+    try:
+        # Messages pushed by the handlers get appended and handled in the
+        # same flush
+        while _pending:
+            handler, message = _pending.popleft()
+            handler(message)
+    finally:
+        _flush_scheduled_on = None
+        # If a handler raised (or a message got pushed from another thread
+        # while finishing) - continue on the next iteration of the loop
+        if _pending:
+            _schedule_flush()
+
 
 def unsibscribe_all():
     for channel_name, channel in _channels.items():
-        for sub_props, sub in list(channel.subscriptions.items()):
+        for sub in list(channel.subscriptions.values()):
             sub.unsubscribe()
 
 
 class Subscription:
+    __slots__ = ('id', 'handler', 'channel', 'index_val', 'order')
 
     def __init__(self, handler, channel, index_val: Any = MISSING):
         self.id = id(self)
         self.handler = handler
         self.channel = channel
         self.index_val = index_val
+        self.order = None  # Set when added to the channel
 
     def props(self):
         return self.handler, self.channel, self.index_val
@@ -49,11 +95,21 @@ class Channel:
         self.index_key = index_key
         self.filter_key = filter_key
         # self.message_stack = []
-        self.subscriptions: Dict[tuple, Subscription] = {}  # by id
-
-        # if index_key:
-        self.subs_index = defaultdict(list)  # Subscriptions by index_val
-        self.non_indexed_subs = []  # Subscriptions without index_val
+        self.subscriptions: Dict[int, Subscription] = {}  # by id
+        # Used only to detect duplicate subscriptions on subscribe
+        self._subscription_props = set()
+
+        # The subscriptions are also bucketed by index_val, so that push
+        # computes the index_key once and does a single lookup. The buckets
+        # are immutable tuples, rebuilt on (un)subscribe (which is rare
+        # compared to pushing), so push can iterate them without locking
+        self.subs_index = {}  # Subscriptions by index_val
+        self.non_indexed_subs = ()  # Subscriptions without index_val
+        self._subscriptions_lock = threading.Lock()
+
+        # Most channels have no filter - skip the check on push for them
+        if not filter_key:
+            self.push = self._push_unfiltered
 
         if name in _channels:
             raise Exception('A channel with this name already exists')
@@ -62,11 +118,16 @@ class Channel:
     def __repr__(self):
         return f'<Channel name={self.name}>'
 
-    @log.traced
     def push(self, message):
-        if self.filter_key:
-            if not self.filter_key(message):
-                return
+        # Skip the filter evaluation when nobody is listening
+        if not self.subscriptions or not self.filter_key(message):
+            return
+        self._push_unfiltered(message)
+
+    @log.traced
+    def _push_unfiltered(self, message):
+        if not self.subscriptions:
+            return
 
         # self.message_stack.append(message)
         # call_delayed(self.notify_subscribers)
@@ -77,36 +138,105 @@ class Channel:
 
         #
 
-        for sub_props, sub in self.subscriptions.items():
-            if self.index_key and sub.index_val is not MISSING:
-                if self.index_key(message) != sub.index_val:
-                    continue
+        subs = self.non_indexed_subs
+        if self.subs_index:
+            indexed_subs = self.subs_index.get(self.index_key(message))
+            if indexed_subs:
+                subs = _in_subscription_order(subs, indexed_subs) if subs \
+                    else indexed_subs
 
+        append = _pending.append
+        for sub in subs:
             # log.info(f'Queueing {sub.handler=} for {message=} on'
             #          f' channel_name={self.name}')
-            fusion.call_delayed(sub.handler, 0, args=[message])
+            append((sub.handler, message))
+
+        _schedule_flush()
+
+    def push_many(self, messages: list):
+        """Push a batch of messages. The subscriptions are iterated once for
+        the whole batch, and each handler is invoked for its messages in
+        order."""
+        if not self.subscriptions:
+            return
+
+        if self.filter_key:
+            messages = [m for m in messages if self.filter_key(m)]
+
+        if not messages:
+            return
+
+        non_indexed_subs = self.non_indexed_subs
+        subs_index = self.subs_index
+        index_key = self.index_key
+        append = _pending.append
+        # Enqueue per message (not per subscription) to keep the FIFO order
+        # consistent with repeated push calls
+        for message in messages:
+            subs = non_indexed_subs
+            if subs_index:
+                indexed_subs = subs_index.get(index_key(message))
+                if indexed_subs:
+                    subs = _in_subscription_order(subs, indexed_subs) \
+                        if subs else indexed_subs
+
+            for sub in subs:
+                append((sub.handler, message))
+
+        _schedule_flush()
 
     def subscribe(self, handler: Callable, index_val: Any = MISSING):
         sub = Subscription(handler, _channels[self.name], index_val)
         self.add_subscribtion(sub)
         return sub
 
-    def add_subscribtion(self, subscribtion):
-        if subscribtion.props() in self.subscriptions:
-            raise Exception(f'Subscription with props {subscribtion.props()} '
-                            f'already added to channel '
-                            f'{self.name}')
+    def _is_indexed(self, subscribtion):
+        # Without an index_key the index_val is disregarded
+        return self.index_key and subscribtion.index_val is not MISSING
 
-        self.subscriptions[subscribtion.props()] = subscribtion
+    def add_subscribtion(self, subscribtion):
+        with self._subscriptions_lock:
+            props = subscribtion.props()
+            if props in self._subscription_props:
+                raise Exception(
+                    f'Subscription with props {props} '
+                    f'already added to channel '
+                    f'{self.name}')
+
+            self._subscription_props.add(props)
+            self.subscriptions[subscribtion.id] = subscribtion
+            subscribtion.order = next(_subscription_counter)
+
+            if self._is_indexed(subscribtion):
+                index_val = subscribtion.index_val
+                self.subs_index[index_val] = (
+                    self.subs_index.get(index_val, ()) + (subscribtion,))
+            else:
+                self.non_indexed_subs = (
+                    self.non_indexed_subs + (subscribtion,))
 
     def remove_subscribtion(self, subscribtion):
-        if subscribtion.props() not in self.subscriptions:
-            raise Exception(
-                f'Cannot unsubscribe missing subscription with props'
-                f' {subscribtion.props()}'
-                f' in channel {self.name}')
-
-        self.subscriptions.pop(subscribtion.props())
+        with self._subscriptions_lock:
+            if subscribtion.id not in self.subscriptions:
+                raise Exception(
+                    f'Cannot unsubscribe missing subscription with props'
+                    f' {subscribtion.props()}'
+                    f' in channel {self.name}')
+
+            del self.subscriptions[subscribtion.id]
+            self._subscription_props.discard(subscribtion.props())
+
+            if self._is_indexed(subscribtion):
+                index_val = subscribtion.index_val
+                bucket = tuple(s for s in self.subs_index[index_val]
+                               if s is not subscribtion)
+                if bucket:
+                    self.subs_index[index_val] = bucket
+                else:
+                    del self.subs_index[index_val]
+            else:
+                self.non_indexed_subs = tuple(
+                    s for s in self.non_indexed_subs if s is not subscribtion)
 
     # def notify_subscribers(self):
     # !!! NO, this way messages get batched by channel and the order is lost
@@ -9,6 +9,7 @@ _commands = {}
 
 
 class Command:
+    __slots__ = ('function', 'title', 'name')
 
     def __init__(self, function: Callable, title: str, name: str):
         self.function = function
@@ -38,6 +39,12 @@ def command(title: str, name: str = ''):
         else:
             fname = name
 
+        # Re-decorating the same function object reuses its command (on a
+        # module reload the functions are new objects and get registered anew)
+        _command = _commands.get(function)
+        if _command and _command.title == title and _command.name == fname:
+            return _command
+
         _command = Command(function, title, fname)
         _commands[function] = _command
         return _command
@@ -45,5 +52,9 @@ def command(title: str, name: str = ''):
     return decorator
 
 
+def command_for(function: Callable) -> Command | None:
+    return _commands.get(function)
+
+
 def commands() -> List[Command]:
     yield from _commands.values()
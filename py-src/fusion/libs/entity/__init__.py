@@ -1,26 +1,46 @@
 from __future__ import annotations
 import json
+import operator
+import sys
 from datetime import datetime
 from typing import Type, TypeVar, Union
-from dataclasses import dataclass, field, fields
+from dataclasses import MISSING, dataclass, field, fields
 from pydantic import BaseModel
 
-import fusion
+try:  # Optional, speeds up the JSON serialization
+    import orjson
+except ImportError:
+    orjson = None
+
 from fusion.logging import get_logger, LOGGING_LEVEL, LoggingLevels
 from fusion.util import get_new_id
 
 log = get_logger(__name__)
 entity_library = {}
 
+# Field values of those types get copied in asdict/copy
+_CONTAINER_TYPES = (list, dict, set)
+# Fields annotated with those can't hold containers and skip the check
+_SCALAR_ANNOTATIONS = frozenset(
+    (str, int, float, bool, 'str', 'int', 'float', 'bool'))
+
 
 _last_entity_id = 0
+# Mirrors fusion.reproducible_ids() (set via fusion.set_reproducible_ids),
+# kept here to avoid the call on each entity construction
+_reproducible_ids = False
+
+
+def set_reproducible_entity_ids(enabled: bool):
+    global _reproducible_ids
+    _reproducible_ids = enabled
 
 
 def get_entity_id():
     global _last_entity_id
-    if fusion.reproducible_ids():
+    if _reproducible_ids:
         _last_entity_id += 1
-        return str(_last_entity_id).zfill(8)
+        return f'{_last_entity_id:08d}'
     else:
         return get_new_id()
 
@@ -60,6 +80,20 @@ def entity_type(entity_class: Type[T], repr: bool = False) -> Type[T]:
 
     entity_class = dataclass(entity_class, repr=repr)
 
+    # Cache the names of the serialized (repr) fields, since calling
+    # dataclasses.fields() on every diff/dump is slow
+    entity_class._FIELD_NAMES = tuple(
+        f.name for f in fields(entity_class) if f.repr)
+    # The rest of the fields are reset to their defaults on copy
+    entity_class._HIDDEN_FIELDS = tuple(
+        f for f in fields(entity_class) if not f.repr)
+    entity_class._ALL_FIELD_NAMES = frozenset(
+        f.name for f in fields(entity_class))
+    # The serialized fields that may hold a container to be copied
+    entity_class._CONTAINER_FIELD_NAMES = tuple(
+        f.name for f in fields(entity_class)
+        if f.repr and f.type not in _SCALAR_ANNOTATIONS)
+
     # Register the entity class
     entity_class_name = entity_class.__name__
     if entity_class_name in entity_library:
@@ -71,11 +105,12 @@ def entity_type(entity_class: Type[T], repr: bool = False) -> Type[T]:
 
 
 def get_entity_class_by_name(entity_class_name: str):
-    if entity_class_name not in entity_library:
+    entity_class = entity_library.get(entity_class_name)
+    if entity_class is None:
         raise Exception(f'Entity class {entity_class_name} not found in '
                         f'entity library. Have you added the @entity_type '
                         f'decorator?')
-    return entity_library[entity_class_name]
+    return entity_class
 
 
 def dump_to_dict(entity: Entity) -> dict:
@@ -97,9 +132,26 @@ def dump_to_dict(entity: Entity) -> dict:
     return entity_dict
 
 
-def dump_as_json(entity: Entity, ensure_ascii=False, **dump_kwargs):
+def dump_as_json(entity: Entity,
+                 ensure_ascii=False,
+                 use_orjson: bool = False,
+                 **dump_kwargs):
+    """Serialize the entity with json.dumps. With use_orjson=True the faster
+    orjson package is used instead (it must be installed). Its output is
+    compact, NaN/Infinity are written as null, and it supports neither
+    ensure_ascii nor the json.dumps kwargs."""
     entity_dict = dump_to_dict(entity)
-    json_str = json.dumps(entity_dict, ensure_ascii=False, **dump_kwargs)
+    if use_orjson:
+        if orjson is None:
+            raise ImportError('use_orjson requires the orjson package')
+        if ensure_ascii or dump_kwargs:
+            raise ValueError('ensure_ascii and the json.dumps kwargs are not '
+                             'supported with use_orjson')
+        return orjson.dumps(entity_dict,
+                            option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    json_str = json.dumps(entity_dict, ensure_ascii=ensure_ascii,
+                          **dump_kwargs)
     return json_str
 
 
@@ -110,13 +162,29 @@ def load_from_json(json_str: str):
 
 
 def load_from_dict(entity_dict: dict):
-    type_name = entity_dict.pop('type_name')
+    # Deserialized names are interned, so that the library lookup matches
+    # the (interned) class name key by identity
+    type_name = sys.intern(entity_dict.pop('type_name'))
     cls = get_entity_class_by_name(type_name)
 
     if not cls:
         raise Exception(f'Entity class {type_name} not found in entity '
                         f'library. Have you added the @entity_type decorator?')
 
+    # If all fields are present (e.g. the dict was produced by dump_to_dict)
+    # - skip __init__ and the default factories (id generation, etc.). Not
+    # done when debugging, so that the field checks in __setattr__ run. And
+    # not for classes with a __post_init__, since it's expected to run
+    # before the loaded values are set
+    if LOGGING_LEVEL != LoggingLevels.DEBUG.value and \
+            cls.__post_init__ is Entity.__post_init__ and \
+            len(entity_dict) == len(cls._FIELD_NAMES) and \
+            all(name in entity_dict for name in cls._FIELD_NAMES):
+        id = entity_dict['id']
+        if isinstance(id, list):  # Mostly when deserializing
+            entity_dict = {**entity_dict, 'id': tuple(id)}
+        return cls._from_field_values(entity_dict)
+
     if 'id' in entity_dict:
         id = entity_dict.pop('id')
         if isinstance(id, list):  # Mostly when deserializing
@@ -164,10 +232,8 @@ class Entity:
                                             repr=False)
 
     def __setattr__(self, key, value):
-        # Do thorough checks only when debugging
-        if LOGGING_LEVEL != LoggingLevels.DEBUG.value:
-            return object.__setattr__(self, key, value)
-
+        # Thorough checks are done only when debugging. Otherwise this method
+        # gets replaced by object.__setattr__ (see below the class)
         if self.immutability_error_message and \
                 key != 'immutability_error_message':
             raise Exception(self.immutability_error_message)
@@ -176,8 +242,7 @@ class Entity:
             if not value.tzinfo:
                 raise Exception
 
-        field_names = [f.name for f in fields(self)]
-        if not hasattr(self, key) and key not in field_names:
+        if key not in type(self)._ALL_FIELD_NAMES and not hasattr(self, key):
             raise Exception('Cannot set missing attribute')
 
         # Since ids are used for hashing - it's wise to make them immutable
@@ -223,15 +288,31 @@ class Entity:
         return entity
 
     def copy(self) -> 'Entity':
-        self_copy = type(self)(**self.asdict())
-        return self_copy
+        return type(self)._from_field_values(self.asdict())
+
+    @classmethod
+    def _from_field_values(cls, field_values: dict) -> Entity:
+        """Construct an entity from a complete dict of field values (as
+        returned by asdict) without going through __init__. Fields excluded
+        from asdict get their default values."""
+        instance = cls.__new__(cls)
+        instance_dict = instance.__dict__
+        instance_dict.update(field_values)
+        for f in cls._HIDDEN_FIELDS:
+            if f.default_factory is not MISSING:
+                instance_dict[f.name] = f.default_factory()
+            elif f.default is not MISSING:
+                instance_dict[f.name] = f.default
+
+        instance.__post_init__()
+        return instance
 
     def with_id(self, new_id: str) -> Entity:
         """A convinience method to produce a copy with a changed id (since
         the 'id' attribute is immutable (used in hashing))."""
         self_dict = self.asdict()
         self_dict['id'] = new_id
-        return type(self)(**self_dict)
+        return type(self)._from_field_values(self_dict)
 
     def gid(self) -> Union[str, tuple]:
         """(Will be deprecated in future versions)
@@ -244,17 +325,51 @@ class Entity:
     def asdict(self) -> dict:
         """Return the entity fields as a dict"""
         # The dataclasses.asdict recurses and that's not what we want
-        self_dict = {
-            f.name: getattr(self, f.name)
-            for f in fields(self) if f.repr
-        }
+        cls = type(self)
+        instance_dict = self.__dict__
+        self_dict = {name: instance_dict[name] for name in cls._FIELD_NAMES}
+        for name in cls._CONTAINER_FIELD_NAMES:
+            val = self_dict[name]
+            if isinstance(val, _CONTAINER_TYPES):
+                self_dict[name] = val.copy()
+
+        return self_dict
 
-        for key, val in self_dict.items():
-            if isinstance(val, (list, dict, set)):
+    def delta_from(self, other: Entity, strict: bool = False) -> dict:
+        """Return the fields (as returned by asdict) whose values differ from
+        the ones in other (an entity of the same type), mapped to the values
+        in self.
+
+        Entity values are compared with Entity.__eq__ (i.e. by id). With
+        strict=True they are compared by identity instead (also inside
+        containers), so that entities with the same id but different
+        contents are detected too.
+        """
+        self_dict = self.__dict__
+        other_dict = other.__dict__
+        values_differ = _values_differ_strict if strict else operator.ne
+        delta = {}
+        for name in type(self)._FIELD_NAMES:
+            val = self_dict[name]
+            other_val = other_dict[name]
+            # Values shared between snapshots skip the (possibly deep) __eq__
+            if val is not other_val and values_differ(val, other_val):
+                delta[name] = val
+        return delta
+
+    def snapshot_with_changes(self, changes: dict) -> Entity:
+        """Return a copy of a snapshot (an entity that won't be modified,
+        e.g. a state backup) with the given field changes applied. Only the
+        changed container values get copied, the rest are shared with self."""
+        self_dict = self.__dict__
+        field_values = {name: self_dict[name]
+                        for name in type(self)._FIELD_NAMES}
+        for key, val in changes.items():
+            if isinstance(val, _CONTAINER_TYPES):
                 val = val.copy()
-                self_dict[key] = val
+            field_values[key] = val
 
-        return self_dict
+        return type(self)._from_field_values(field_values)
 
     def replace(self, **changes):
         """Update entity fields using keyword arguments"""
@@ -272,8 +387,10 @@ class Entity:
                     'To produce a copy with a changed id use Entity.with_id')
 
         leftovers = {}
+        field_names = type(self)._ALL_FIELD_NAMES
         for key, val in changes.items():
-            if not hasattr(self, key):
+            # hasattr is a fallback for properties defined by subclasses
+            if key not in field_names and not hasattr(self, key):
                 leftovers[key] = val
                 continue
             setattr(self, key, val)
@@ -297,6 +414,36 @@ class Entity:
         self.immutability_error_message = error_message
 
 
+def _values_differ_strict(val, other_val) -> bool:
+    # Like !=, but entities (also in containers) are compared by identity
+    if val is other_val:
+        return False
+    if isinstance(val, Entity) or isinstance(other_val, Entity):
+        return True
+    if type(val) is not type(other_val):
+        return val != other_val
+
+    if isinstance(val, dict):
+        return val.keys() != other_val.keys() or any(
+            _values_differ_strict(item, other_val[key])
+            for key, item in val.items())
+    elif isinstance(val, (list, tuple)):
+        return len(val) != len(other_val) or any(
+            map(_values_differ_strict, val, other_val))
+    elif isinstance(val, (set, frozenset)):
+        if val != other_val:
+            return True
+        # Equal sets may still hold different entity objects with equal ids
+        other_item_ids = {id(item) for item in other_val}
+        return any(id(item) not in other_item_ids for item in val)
+    return val != other_val
+
+
+# Skip the debug checks altogether (instead of branching on each assignment)
+if LOGGING_LEVEL != LoggingLevels.DEBUG.value:
+    Entity.__setattr__ = object.__setattr__
+
+
 class PDSerializedEntity(BaseModel):
     id: str
     type_name: str
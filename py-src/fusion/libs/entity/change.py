@@ -1,19 +1,33 @@
 from __future__ import annotations
 
 from copy import copy
-from dataclasses import fields
 from datetime import datetime
 from enum import Enum
-from typing import Any, Generator, Iterable, Optional
+from typing import Iterable, Optional
 
 from pydantic import BaseModel
 
 from fusion import get_logger
 from fusion.libs.entity import dump_to_dict, load_from_dict, Entity
+from fusion.logging import LOGGING_LEVEL, LoggingLevels
 from fusion.util import current_time, get_new_id, timestamp as fusion_timestamp
 
 log = get_logger(__name__)
 
+_SET_TYPES = (set, frozenset)
+
+
+# Immutability (Entity.set_immutable) is enforced only in debug mode
+_IMMUTABILITY_ENFORCED = LOGGING_LEVEL == LoggingLevels.DEBUG.value
+
+
+def _snapshot(state: Entity) -> Entity:
+    # Entities which can't be modified (e.g. the ones in a repository) are
+    # safe to share
+    if _IMMUTABILITY_ENFORCED and state.immutability_error_message:
+        return state
+    return copy(state)
+
 
 class DiffTypes(Enum):
     ADDED = 1
@@ -30,19 +44,37 @@ class Diff:
         if not isinstance(old_val, Iterable) and isinstance(new_val, Iterable):
             raise Exception('Attribute type is not Iterable')
 
+        if isinstance(new_val, _SET_TYPES) and isinstance(old_val, _SET_TYPES):
+            yield from new_val - old_val
+            return
+
+        try:
+            old_set = set(old_val)
+        except TypeError:  # Unhashable items - fall back to a linear scan
+            old_set = old_val
         for item in new_val:
-            if item not in old_val:
+            if item not in old_set:
                 yield item
 
     def return_removed(self, old_val, new_val):
         if not isinstance(old_val, Iterable) and isinstance(new_val, Iterable):
             raise Exception('Attribute type is not Iterable')
 
+        if isinstance(new_val, _SET_TYPES) and isinstance(old_val, _SET_TYPES):
+            yield from old_val - new_val
+            return
+
+        try:
+            new_set = set(new_val)
+        except TypeError:  # Unhashable items - fall back to a linear scan
+            new_set = new_val
         for item in old_val:
-            if item not in new_val:
+            if item not in new_set:
                 yield item
 
-    def __getattr__(self, key) -> Generator[Any, None, None]:
+    def __getattr__(self, key) -> tuple:
+        # Only called on the first access for a given key - the result is
+        # then cached in the instance dict
         if not hasattr(self.change.new_state, key):
             raise AttributeError
 
@@ -61,10 +93,13 @@ class Diff:
         new_val = getattr(self.change.new_state, key, [])
 
         if self.type == DiffTypes.ADDED:
-            yield from self.return_added(old_val, new_val)
+            diff = tuple(self.return_added(old_val, new_val))
 
         else:  # self.type == DiffTypes.REMOVED:
-            yield from self.return_removed(old_val, new_val)
+            diff = tuple(self.return_removed(old_val, new_val))
+
+        self.__dict__[key] = diff
+        return diff
 
 
 class Updated:
@@ -72,7 +107,14 @@ class Updated:
     def __init__(self, change: Change):
         self.change = change
 
-    def __getattr__(self, key):
+    def __getattr__(self, key) -> bool:
+        # Only called on the first access for a given key - the result is
+        # then cached in the instance dict
+        updated = self._resolve(key)
+        self.__dict__[key] = updated
+        return updated
+
+    def _resolve(self, key) -> bool:
         if self.change.is_create():
             if not hasattr(self.change.new_state, key):
                 raise AttributeError
@@ -86,14 +128,15 @@ class Updated:
             return False
 
         else:  # is_update()
-            if not hasattr(self.change.old_state, key):
+            old_state = self.change.old_state
+            new_state = self.change.new_state
+            if key in type(old_state)._FIELD_NAMES:
+                return key in self.change._get_delta()
+
+            if not hasattr(old_state, key):
                 raise Exception
 
-            if getattr(self.change.old_state, key) != \
-                    getattr(self.change.new_state, key):
-                return True
-            else:
-                return False
+            return getattr(old_state, key) != getattr(new_state, key)
 
 
 class ChangeTypes(Enum):
@@ -107,6 +150,8 @@ class Change:
     """An object representing a change in the entity state. It holds the old
      and the new states (as entities) as well as the change type.
     """
+    __slots__ = ('_id', 'old_state', 'new_state', '_timestamp', '_time',
+                 'change_type', '_added', '_removed', '_updated', '_delta')
 
     def __init__(self,
                  old_state: Entity = None,
@@ -120,7 +165,7 @@ class Change:
         Raises:
             Exception: Missing id attribute of either entity state.
         """
-        self.id = id or get_new_id()
+        self._id = id or None  # Generated on first access
 
         # This may be done only in debug mode
         if (old_state and not isinstance(old_state, Entity)) or \
@@ -130,14 +175,24 @@ class Change:
         self.old_state = old_state
         self.new_state = new_state
 
-        self.timestamp = timestamp or fusion_timestamp(current_time(),
-                                                       microseconds=True)
+        # The time is captured here, but it's formatted only when the
+        # timestamp is accessed (most changes never get serialized)
+        self._timestamp = timestamp or None
+        self._time = None if timestamp else current_time()
 
         self._added = None
         self._removed = None
         self._updated = None
-
-        if not (self.old_state or self.new_state):
+        self._delta = None
+
+        # Computed once, since the predicates below are called very often
+        if old_state and new_state:
+            self.change_type = ChangeTypes.UPDATE
+        elif new_state:
+            self.change_type = ChangeTypes.CREATE
+        elif old_state:
+            self.change_type = ChangeTypes.DELETE
+        else:
             raise ValueError('Both old and new state are None.')
 
     def __repr__(self) -> str:
@@ -145,9 +200,23 @@ class Change:
                 f'type={self.change_type} '
                 f'old_state={self.old_state} new_state={self.new_state}>')
 
+    @property
+    def id(self) -> str:
+        if self._id is None:
+            self._id = get_new_id()
+        return self._id
+
+    @property
+    def timestamp(self) -> str:
+        if self._timestamp is None:
+            self._timestamp = fusion_timestamp(self._time, microseconds=True)
+        return self._timestamp
+
     @property
     def time(self) -> datetime:
-        return datetime.fromisoformat(self.timestamp)
+        if self._time is None:
+            self._time = datetime.fromisoformat(self._timestamp)
+        return self._time
 
     @property
     def added(self) -> Diff:
@@ -170,24 +239,16 @@ class Change:
 
         return self._updated
 
-    @property
-    def change_type(self):
-        if self.old_state and self.new_state:
-            return ChangeTypes.UPDATE
-        elif not self.old_state and not self.new_state:
-            return ChangeTypes.EMPTY
-        elif not self.old_state:
-            return ChangeTypes.CREATE
-        else:
-            return ChangeTypes.DELETE
-
     def asdict(self) -> dict:
+        return self._asdict(dump_new_state=True)
+
+    def _asdict(self, dump_new_state: bool) -> dict:
         if self.old_state:
             old_state = dump_to_dict(self.old_state)
         else:
             old_state = None
 
-        if self.new_state:
+        if self.new_state and dump_new_state:
             new_state = dump_to_dict(self.new_state)
         else:
             new_state = None
@@ -199,9 +260,8 @@ class Change:
 
     @classmethod
     def from_dict(cls, change_dict: dict) -> Change:
-        if 'delta' in change_dict:
-            return cls.from_safe_delta_dict(change_dict)
-        return cls(**change_dict)
+        # Handles both full dicts and safe delta dicts
+        return cls.from_safe_delta_dict(change_dict)
 
     @classmethod
     def from_safe_delta_dict(cls, change_dict: dict) -> Change:
@@ -211,11 +271,11 @@ class Change:
         if 'timestamp' not in change_dict:
             raise Exception('Missing timestamp in change dict')
 
-        # Get the delta and use it to generate the new_state
+        # Get the delta and use it to generate the new_state. CREATE and
+        # DELETE changes have no delta and their states are loaded as-is
         delta = change_dict.pop('delta', None)
-        if delta is not None:
-            new_state_dict = copy(old_state_dict)
-            new_state_dict.update(**delta)
+        if delta is not None and old_state_dict is not None:
+            new_state_dict = {**old_state_dict, **delta}
 
         if old_state_dict:
             change_dict['old_state'] = load_from_dict(old_state_dict)
@@ -225,47 +285,77 @@ class Change:
         return cls(**change_dict)
 
     def as_safe_delta_dict(self):
-        self_dict = self.asdict()
+        # For updates only the old state and the delta get serialized
+        is_update = self.is_update()
+        self_dict = self._asdict(dump_new_state=not is_update)
 
-        if self.is_update():
+        if is_update:
             self_dict['delta'] = self.delta()
             del self_dict['new_state']
 
         return self_dict
 
-    def delta(self):
-        delta_dict = {}
-        for field in fields(self.old_state):
-            old_val = getattr(self.old_state, field.name)
-            new_val = getattr(self.new_state, field.name)
-            if old_val != new_val:
-                delta_dict[field.name] = new_val
-
-        return delta_dict
+    def _get_delta(self) -> dict:
+        # The field comparison is done once and shared by delta(), the
+        # Updated helper and the serialization
+        if self._delta is None:
+            self._delta = self.new_state.delta_from(self.old_state)
+        return self._delta
+
+    def delta(self) -> dict:
+        return dict(self._get_delta())
+
+    def changed_field_names(self) -> Iterable[str]:
+        """Returns the names of the entity fields affected by the change
+        (all fields for CREATE, none for DELETE)."""
+        if self.change_type is ChangeTypes.UPDATE:
+            return self._get_delta().keys()
+        elif self.change_type is ChangeTypes.CREATE:
+            return type(self.new_state)._FIELD_NAMES
+        return ()
 
     @classmethod
-    def CREATE(cls, state: Entity) -> Change:
-        """Convenience method for constructing a Change with type CREATE"""
-        return cls(new_state=copy(state))
+    def CREATE(cls, state: Entity, copy_states: bool = True) -> Change:
+        """Convenience method for constructing a Change with type CREATE.
+        Pass copy_states=False if the state is already a snapshot that won't
+        be modified (e.g. a backup held by the state manager). In debug
+        mode entities marked as immutable are not copied."""
+        if copy_states:
+            state = _snapshot(state)
+        return cls(new_state=state)
 
     @classmethod
-    def UPDATE(cls, old_state: Entity, new_state: Entity) -> Change:
-        """Convenience method for constructing a Change with type UPDATE"""
-        return cls(old_state=copy(old_state), new_state=copy(new_state))
+    def UPDATE(cls,
+               old_state: Entity,
+               new_state: Entity,
+               copy_states: bool = True) -> Change:
+        """Convenience method for constructing a Change with type UPDATE.
+        See CREATE for the copy_states argument."""
+        if copy_states:
+            old_state = _snapshot(old_state)
+            new_state = _snapshot(new_state)
+        elif LOGGING_LEVEL == LoggingLevels.DEBUG.value and \
+                old_state is new_state:
+            raise Exception('The old and new states of an UPDATE change '
+                            'should be different objects.')
+        return cls(old_state=old_state, new_state=new_state)
 
     @classmethod
-    def DELETE(cls, old_state: Entity) -> Change:
-        """Convenience method for constructing a Change with type DELETE"""
-        return cls(old_state=copy(old_state))
+    def DELETE(cls, old_state: Entity, copy_states: bool = True) -> Change:
+        """Convenience method for constructing a Change with type DELETE.
+        See CREATE for the copy_states argument."""
+        if copy_states:
+            old_state = _snapshot(old_state)
+        return cls(old_state=old_state)
 
     def is_create(self) -> bool:
-        return self.change_type == ChangeTypes.CREATE
+        return self.change_type is ChangeTypes.CREATE
 
     def is_update(self) -> bool:
-        return self.change_type == ChangeTypes.UPDATE
+        return self.change_type is ChangeTypes.UPDATE
 
     def is_delete(self) -> bool:
-        return self.change_type == ChangeTypes.DELETE
+        return self.change_type is ChangeTypes.DELETE
 
     def last_state(self) -> Entity:
         """Returns the latest available state.
@@ -281,12 +371,15 @@ class Change:
         return self.new_state
 
     def reversed(self) -> Change:
-        if self.is_create():
-            return Change.DELETE(self.new_state)
-        elif self.is_delete():
-            return Change.CREATE(self.old_state)
-        elif self.is_update:
-            return Change.UPDATE(self.new_state, self.old_state)
+        """Returns the inverse change. The states are snapshots, so they are
+        reused without copying."""
+        if self.change_type is ChangeTypes.CREATE:
+            return Change.DELETE(self.new_state, copy_states=False)
+        elif self.change_type is ChangeTypes.DELETE:
+            return Change.CREATE(self.old_state, copy_states=False)
+        else:  # UPDATE
+            return Change.UPDATE(self.new_state, self.old_state,
+                                 copy_states=False)
 
 
 class PDChange(BaseModel):
@@ -3,7 +3,7 @@ from dataclasses import field
 from typing import Type, TypeVar
 
 from fusion import entity_type, fsm
-from fusion.libs.action import is_in_action
+from fusion.libs.action import _action_context_stack
 from fusion.libs.entity import Entity
 from fusion.logging import LOGGING_LEVEL, LoggingLevels
 
@@ -32,11 +32,12 @@ class ViewState(Entity):
     _version: int = field(default=0, init=False, repr=False)
 
     def __setattr__(self, key, value):
-        # Do thorough checks only when debugging
-        if LOGGING_LEVEL != LoggingLevels.DEBUG.value:
-            return object.__setattr__(self, key, value)
+        # Thorough checks are done only when debugging. Otherwise this method
+        # gets replaced by object.__setattr__ (see below the class)
 
-        if self._added and not is_in_action():
+        # Private attributes (e.g. _version) are bookkeeping by the state
+        # manager and skip the action check
+        if key[0] != '_' and self._added and not _action_context_stack:
             raise Exception('View states can be modified only in actions')
 
         # Allow setting the view id only on init
@@ -49,3 +50,7 @@ class ViewState(Entity):
     def __repr__(self) -> str:
         return (f'<{type(self).__name__} id={self.id}'
                 f'view_id={self.view_id}>')
+
+
+if LOGGING_LEVEL != LoggingLevels.DEBUG.value:
+    ViewState.__setattr__ = object.__setattr__
@@ -37,6 +37,15 @@ class BColors:
 function_call_stack_per_thread = defaultdict(list)
 logging.basicConfig(level=LOGGING_LEVEL)
 
+# Precomputed log line prefixes for the common nesting depths
+_INDENTS = tuple('.' * 4 * depth for depth in range(32))
+
+
+def indent_for_depth(depth: int) -> str:
+    if depth < 32:
+        return _INDENTS[depth]
+    return '.' * 4 * depth
+
 
 def _get_trace_decorator(logger_name: str):
     def trace_decorator(func: Callable):
@@ -53,13 +62,18 @@ def _get_trace_decorator(logger_name: str):
 
         @functools.wraps(func)
         def wrapper_func(*args, **kwargs):
+            # Skip the tracing work if the level got raised at runtime
+            # (isEnabledFor results are cached by the logging module)
+            if not log.isEnabledFor(logging.DEBUG):
+                return func(*args, **kwargs)
+
             # Keep separate function stacks per thread
             thread_id = threading.get_ident()
             function_call_stack_per_thread[thread_id].append(name)
 
             # Prep the log string
             stack_depth = len(function_call_stack_per_thread[thread_id])
-            indent = '.' * 4 * (stack_depth - 1)
+            indent = indent_for_depth(stack_depth - 1)
 
             args_string = ', '.join([str(a) for a in args])
             kwargs_string = ', '.join([f'{k}={v}' for k, v in kwargs.items()])
@@ -103,6 +117,9 @@ class Logger:
     def debug(self, *args, **kwargs):
         self.py_logger.debug(*args, **kwargs)
 
+    def is_enabled_for(self, level: int) -> bool:
+        return self.py_logger.isEnabledFor(level)
+
 
 def get_logger(name: str) -> Logger:
     """Get a logger with the given name. This is the preferred way of logging
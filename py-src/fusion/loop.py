@@ -1,4 +1,6 @@
 from typing import Callable
+import heapq
+import itertools
 import time
 
 
@@ -22,7 +24,10 @@ class NoMainLoop(MainLoop):
     of actually initializing a main loop. Used mostly for testing."""
 
     def __init__(self):
-        self.callback_stack = []
+        # A heap of (call_time, sequence_number, callback, args, kwargs). The
+        # sequence number keeps callbacks with equal call times in FIFO order
+        self.callback_heap = []
+        self._call_counter = itertools.count()
 
     def call_delayed(self,
                      callback: Callable,
@@ -32,18 +37,19 @@ class NoMainLoop(MainLoop):
 
         args = args or []
         kwargs = kwargs or {}
-        self.callback_stack.append(
-            (callback, time.time() + delay, args, kwargs))
+        heapq.heappush(
+            self.callback_heap,
+            (time.time() + delay, next(self._call_counter), callback, args,
+             kwargs))
 
     def process_events(self):
-        callback_stack = self.callback_stack
-        self.callback_stack = []
-        for callback, call_time, args, kwargs in callback_stack:
-            if time.time() >= call_time:
-                callback(*args, **kwargs)
-
-        if self.callback_stack:
-            self.process_events()
+        """Invoke the callbacks that are due (including ones that got
+        scheduled by the invoked callbacks). The ones scheduled for later
+        are kept for subsequent calls."""
+        callback_heap = self.callback_heap
+        while callback_heap and callback_heap[0][0] <= time.time():
+            _, _, callback, args, kwargs = heapq.heappop(callback_heap)
+            callback(*args, **kwargs)
 
 
 _main_loop = NoMainLoop()
@@ -8,9 +8,15 @@ from fusion.libs.state import ViewState
 def bind_and_apply_state(qobject: QObject, state: ViewState,
                          on_state_change: Callable):
 
+    view_id = state.view_id
     subscription = fsm.state_changes_per_TLA_by_view_id.subscribe(
-        on_state_change, index_val=state.view_id)
-    qobject.destroyed.connect(lambda: subscription.unsubscribe())
+        on_state_change, index_val=view_id)
+
+    def on_destroyed():
+        subscription.unsubscribe()
+        fsm.release_state_backup(view_id)
+
+    qobject.destroyed.connect(on_destroyed)
 
     # fusion.call_delayed(on_state_change, args=[Change.CREATE(state)])
     on_state_change(Change.CREATE(state))
@@ -1,25 +1,96 @@
 import threading
+from collections import deque
 from time import sleep
 from typing import Callable
 from PySide6.QtCore import QMetaObject, QObject, QTimer, Qt, Slot
 from PySide6.QtWidgets import QApplication
 from fusion.loop import MainLoop
 
+# Bound once, since call_delayed is on the hot path
+_single_shot = QTimer.singleShot
+
 
 class ProxyCall(QObject):
 
     def __init__(self,
                  handler: callable,
                  args: list = None,
-                 kwargs: dict = None) -> None:
+                 kwargs: dict = None,
+                 on_invoked: Callable = None) -> None:
         super().__init__()
         self.handler = handler
         self.args = args or []
         self.kwargs = kwargs or {}
+        self.on_invoked = on_invoked
 
     @Slot()
     def invoke(self):
-        self.handler(*self.args, **self.kwargs)
+        try:
+            self.handler(*self.args, **self.kwargs)
+        finally:
+            # The proxy is single use - release it
+            if self.on_invoked:
+                self.on_invoked(self)
+            self.deleteLater()
+
+
+class _CountedCall:
+    """A callback scheduled on the QtMainLoop. Decrements the loop's pending
+    calls count when invoked."""
+    __slots__ = ('main_loop', 'callback', 'args', 'kwargs')
+
+    def __init__(self, main_loop: 'QtMainLoop', callback: Callable,
+                 args: list, kwargs: dict):
+        self.main_loop = main_loop
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self):
+        self.main_loop.queue_checksum -= 1
+        self.callback(*self.args, **self.kwargs)
+
+
+class ZeroDelayDispatcher(QObject):
+    """Invokes the callbacks scheduled without a delay. All callbacks queued
+    until the dispatcher gets to run are handled in a single queued slot
+    invocation (instead of a QTimer per callback)."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.callbacks = deque()
+        self._lock = threading.Lock()
+        self._drain_scheduled = False
+
+    def add(self, callback: Callable, args: list, kwargs: dict):
+        self.callbacks.append((callback, args, kwargs))
+        with self._lock:
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        self._schedule_drain()
+
+    def _schedule_drain(self):
+        # Queued, so it's safe to call from other threads too
+        success = QMetaObject.invokeMethod(self, 'drain',
+                                           Qt.QueuedConnection)
+        if not success:
+            raise Exception('Failed to invoke method')
+
+    @Slot()
+    def drain(self):
+        callbacks = self.callbacks
+        try:
+            while callbacks:
+                callback, args, kwargs = callbacks.popleft()
+                callback(*args, **kwargs)
+        finally:
+            # If a callback raised (or one got added after the loop ended) -
+            # continue on the next dispatch
+            with self._lock:
+                self._drain_scheduled = bool(callbacks)
+            if self._drain_scheduled:
+                self._schedule_drain()
 
 
 class QtMainLoop(MainLoop):
@@ -27,7 +98,10 @@ class QtMainLoop(MainLoop):
     def __init__(self, app: QApplication):
         self.app = app
         self.queue_checksum = 0
-        self.tmp_proxies_list = []
+        self.tmp_proxies = set()
+        self._main_thread_ident = threading.main_thread().ident
+        # Created in the main thread, so its slots get invoked there
+        self.zero_delay_dispatcher = ZeroDelayDispatcher()
 
     def call_delayed(self,
                      callback: Callable,
@@ -38,23 +112,22 @@ class QtMainLoop(MainLoop):
         args = args or []
         kwargs = kwargs or {}
 
-        if not isinstance(callback, Callable):
+        if not callable(callback):
             raise Exception
 
-        def report_and_callback():
-            self.queue_checksum -= 1
-            callback(*args, **kwargs)
-
+        counted_call = _CountedCall(self, callback, args, kwargs)
         self.queue_checksum += 1
 
-        # lambda: callback(*args, **kwargs))
-        if threading.current_thread() is threading.main_thread():
-            QTimer.singleShot(delay * 1000, report_and_callback)
+        if not delay:
+            self.zero_delay_dispatcher.add(counted_call, (), {})
+        elif threading.get_ident() == self._main_thread_ident:
+            _single_shot(delay * 1000, counted_call)
         else:
             # If we are not in the main thread, we need to use the proxy hack
-            proxy = ProxyCall(report_and_callback)
+            proxy = ProxyCall(counted_call,
+                              on_invoked=self.tmp_proxies.discard)
             proxy.moveToThread(self.app.thread())
-            self.tmp_proxies_list.append(proxy)
+            self.tmp_proxies.add(proxy)
             success = QMetaObject.invokeMethod(proxy, 'invoke',
                                                Qt.QueuedConnection)
             if not success:
@@ -62,14 +135,16 @@ class QtMainLoop(MainLoop):
 
     def process_events(self, repeat: int = 0):
         # A hacky way to be sure that all posted events are called
-        self.app.processEvents()  # QEventLoop.WaitForMoreEvents
-        self.app.sendPostedEvents()
-        if self.queue_checksum:
-            self.process_events()
-
-        if repeat:
-            sleep(0.001)
-            self.process_events(repeat=repeat - 1)
+        for iteration in range(repeat + 1):
+            self.app.processEvents()  # QEventLoop.WaitForMoreEvents
+            self.app.sendPostedEvents()
+            # Keep going while there are pending delayed calls
+            while self.queue_checksum:
+                self.app.processEvents()
+                self.app.sendPostedEvents()
+
+            if iteration < repeat:
+                sleep(0.001)
 
     def loop(self):
         self.app.exec()
@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from typing import List, Union
 from fusion import Entity
 from fusion.libs.entity.change import Change
@@ -31,12 +32,23 @@ class Repository:
     def remove_one(self, entity: Entity) -> Change:
         raise NotImplementedError
 
-    # Batch operations (inefficient implementations)
+    @contextmanager
+    def transaction(self):
+        """Groups the operations in a batch. Override it in repositories
+        with a backing store to e.g. commit once per batch instead of once
+        per entity. Does nothing by default."""
+        yield
+
+    # Batch operations (generic implementations - override them where the
+    # storage supports proper bulk operations)
     def insert(self, batch: List[Entity]) -> List[Change]:
-        return [self.insert_one(entity) for entity in batch]
+        with self.transaction():
+            return [self.insert_one(entity) for entity in batch]
 
     def remove(self, batch: List[Entity]) -> List[Change]:
-        return [self.remove_one(entity) for entity in batch]
+        with self.transaction():
+            return [self.remove_one(entity) for entity in batch]
 
     def update(self, batch: List[Entity]) -> List[Change]:
-        return [self.update_one(entity) for entity in batch]
+        with self.transaction():
+            return [self.update_one(entity) for entity in batch]
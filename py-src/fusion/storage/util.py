@@ -4,16 +4,20 @@ from fusion.libs.entity import Entity, dump_to_dict
 def envelope(**kwargs) -> dict:
     """Wrap the data in an envelope"""
 
-    # Traverse and serialize entities
-    def traverse(obj):
+    # Traverse the nested dicts/lists (iteratively, to avoid deep recursion)
+    # and serialize the entities in place
+    stack = [kwargs]
+    while stack:
+        obj = stack.pop()
         if isinstance(obj, dict):
-            for key, val in obj.items():
-                obj[key] = traverse(val)
-        elif isinstance(obj, list):
-            for i, val in enumerate(obj):
-                obj[i] = traverse(val)
-        elif isinstance(obj, Entity):
-            obj = dump_to_dict(obj)
-        return obj
+            items = obj.items()
+        else:  # list
+            items = enumerate(obj)
 
-    return traverse(kwargs)
+        for key, val in items:
+            if isinstance(val, Entity):
+                obj[key] = dump_to_dict(val)
+            elif isinstance(val, (dict, list)):
+                stack.append(val)
+
+    return kwargs
@@ -12,7 +12,6 @@ from typing import Generator, Any, List, Union
 
 from collections.abc import Iterable
 import random
-import uuid
 from datetime import datetime
 
 
@@ -51,8 +50,9 @@ def get_new_id(seed=None) -> str:
     """Get a random id"""
     if seed:
         return md5(str(seed).encode('utf-8')).hexdigest()[-8:]
-    guid = str(uuid.UUID(int=random.getrandbits(128)))[-8:]
-    return guid
+    # Same as the last 8 characters of str(uuid.UUID(int=bits)), without
+    # constructing the UUID
+    return '%08x' % (random.getrandbits(128) & 0xFFFFFFFF)
 
 
 def verify_id_format(id: str) -> bool:
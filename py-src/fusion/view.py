@@ -15,6 +15,7 @@ class View:
         if not initial_state:
             initial_state = ViewState()
         self._view_id = initial_state.view_id
+        fsm.register_view(self)
 
     def __repr__(self):
         return '<%s view_id=%s>' % (type(self).__name__, self.view_id)
@@ -24,8 +25,6 @@ class View:
         return self._view_id
 
     def state(self) -> ViewState:
-        if fsm.view_state_exists(self._view_id):
-            self_state = fsm.view_state(self._view_id)
-        else:  # View got deleted (but hasn't been destroyed yet)
-            self_state = fsm.get_state_backup(self._view_id)
-        return self_state
+        # If the view got deleted (but hasn't been destroyed yet) - this
+        # returns the last backup
+        return fsm.get_view_state_or_backup(self._view_id)
@@ -1,5 +1,8 @@
+from __future__ import annotations
 from copy import copy
+import functools
 import inspect
+import io
 import json
 import time
 from pathlib import Path
@@ -16,6 +19,18 @@ from pamet.model.arrow import ArrowAnchorType
 from pamet.util.url import Url
 
 
+@functools.lru_cache(maxsize=None)
+def _get_param_names(func) -> tuple:
+    """The names of the positional parameters of a function (cached, since
+    inspect.signature is slow)"""
+    # Like inspect.signature - follow functools.wraps decorators
+    code = getattr(inspect.unwrap(func), '__code__', None)
+    if code is not None:
+        return code.co_varnames[:code.co_argcount]
+    # Builtins, callable objects, etc.
+    return tuple(inspect.signature(func).parameters)
+
+
 @contextmanager
 def exec_action(delay_before_next: float = 0, apply_delay=True, speedup=2):
     t0 = time.time()
@@ -30,6 +45,101 @@ def exec_action(delay_before_next: float = 0, apply_delay=True, speedup=2):
         time.sleep(time_left / speedup)
 
 
+def _parse_scalar(camera: ActionCamera, arg) -> str:
+    return str(arg)
+
+
+def _parse_str(camera: ActionCamera, arg: str) -> str:
+    return json.dumps(arg)  # Deal with escaping, etc.
+
+
+def _parse_none(camera: ActionCamera, arg: None) -> str:
+    return 'None'
+
+
+def _parse_util_class(camera: ActionCamera, arg) -> str:
+    camera.classes_used.add(type(arg))
+    return f'{type(arg).__name__}{arg.as_tuple()}'
+
+
+def _parse_list(camera: ActionCamera, arg: list) -> str:
+    return '[' + ', '.join([camera.parse_arg(a) for a in arg]) + ']'
+
+
+def _parse_tuple(camera: ActionCamera, arg: tuple) -> str:
+    return '(' + ', '.join([camera.parse_arg(a) for a in arg]) + ')'
+
+
+def _parse_dict(camera: ActionCamera, arg: dict) -> str:
+    return '{' + ', '.join([
+        f'{camera.parse_arg(key)}: {camera.parse_arg(val)}'
+        for key, val in arg.items()]) + '}'
+
+
+def _parse_view_state(camera: ActionCamera, arg: ViewState) -> str:
+    return f"fsm.view_state('{arg.view_id}')"
+
+
+def _parse_entity(camera: ActionCamera, arg: Entity) -> str:
+    entity_class = type(arg)
+    camera.classes_used.add(entity_class)
+    # Read the fields directly (asdict would copy the containers)
+    arg_dict = arg.__dict__
+    kwargs_str = ', '.join([
+        f'{name}={camera.parse_arg(arg_dict[name])}'
+        for name in entity_class._FIELD_NAMES])
+    return f'{entity_class.__name__}({kwargs_str})'
+
+
+def _parse_anchor_type(camera: ActionCamera, arg: ArrowAnchorType) -> str:
+    camera.classes_used.add(ArrowAnchorType)
+    return f'{ArrowAnchorType.__name__}.{arg.name}'
+
+
+def _parse_url(camera: ActionCamera, arg: Url) -> str:
+    return json.dumps(str(arg))
+
+
+def _parser_for_type(arg_type: type):
+    """Resolve the parser for types missing from _arg_parsers_by_type"""
+    if issubclass(arg_type, str):
+        return _parse_str
+    elif issubclass(arg_type, (bool, int, float)):
+        return _parse_scalar
+    elif issubclass(arg_type, ViewState):
+        return _parse_view_state
+    elif issubclass(arg_type, Entity):
+        return _parse_entity
+    elif issubclass(arg_type, (Point2D, Rectangle, Color)):
+        return _parse_util_class
+    elif issubclass(arg_type, ArrowAnchorType):
+        return _parse_anchor_type
+    elif issubclass(arg_type, dict):
+        return _parse_dict
+    elif issubclass(arg_type, list):
+        return _parse_list
+    elif issubclass(arg_type, tuple):
+        return _parse_tuple
+    elif issubclass(arg_type, Url):
+        return _parse_url
+    return None
+
+
+_arg_parsers_by_type = {
+    str: _parse_str,
+    bool: _parse_scalar,
+    int: _parse_scalar,
+    float: _parse_scalar,
+    type(None): _parse_none,
+    Point2D: _parse_util_class,
+    Rectangle: _parse_util_class,
+    Color: _parse_util_class,
+    list: _parse_list,
+    tuple: _parse_tuple,
+    dict: _parse_dict,
+}
+
+
 class ActionCamera:
 
     def __init__(self, max_delay=1, latency=0.5):
@@ -51,50 +161,22 @@ class ActionCamera:
             time.sleep(self.latency)
 
     def parse_arg(self, arg):
-        if isinstance(arg, str):
-            return json.dumps(arg)  # Deal with escaping, etc.
-        elif isinstance(arg, (bool, int, float)):
-            return str(arg)
-        elif isinstance(arg, ViewState):
-            return f"fsm.view_state('{arg.view_id}')"
-        elif isinstance(arg, Entity):
-            self.classes_used.add(type(arg))
-            kwarg_strings = []
-            for key, val in arg.asdict().items():
-                # key_str = self.parse_arg(key)
-                val_str = self.parse_arg(val)
-                kwarg_strings.append(f'{key}={val_str}')
-            kwargs_str = ', '.join(kwarg_strings)
-            return f'{type(arg).__name__}({kwargs_str})'
-        elif isinstance(arg, (Point2D, Rectangle, Color)):
-            self.classes_used.add(type(arg))
-            return f'{type(arg).__name__}{arg.as_tuple()}'
-        elif isinstance(arg, ArrowAnchorType):
-            self.classes_used.add(ArrowAnchorType)
-            return f'{ArrowAnchorType.__name__}.{arg.name}'
-        elif isinstance(arg, dict):
-            key_val_strings = []
-            for key, val in arg.items():
-                key_val_str = f'{self.parse_arg(key)}: {self.parse_arg(val)}'
-                key_val_strings.append(key_val_str)
-            all_data_str = ', '.join(key_val_strings)
-            return '{' + all_data_str + '}'
-        elif isinstance(arg, list):
-            all_data_str = ', '.join([self.parse_arg(a) for a in arg])
-            return '[' + all_data_str + ']'
-        elif isinstance(arg, tuple):
-            all_data_str = ', '.join([self.parse_arg(a) for a in arg])
-            return '(' + all_data_str + ')'
-        elif isinstance(arg, Url):
-            return json.dumps(str(arg))
-        elif arg is None:
-            return 'None'
-        else:
-            raise Exception
+        arg_type = type(arg)
+        parse = _arg_parsers_by_type.get(arg_type)
+        if parse is None:
+            # Subclasses (entities, view states, etc.) get resolved once
+            parse = _parser_for_type(arg_type)
+            if parse is None:
+                raise Exception
+            _arg_parsers_by_type[arg_type] = parse
+
+        return parse(self, arg)
 
-    def generate_code_for_action_call(self, action_call: ActionCall):
+    def generate_code_for_action_call(self,
+                                      action_call: ActionCall,
+                                      action_call_idx: int):
         func = action_call.function
-        func_params = list(inspect.signature(func).parameters.keys())
+        func_params = _get_param_names(func)
         kwargs = copy(action_call.kwargs)
 
         # Convert all to kwargs, so we have better readability
@@ -112,14 +194,12 @@ class ActionCamera:
                 kwarg_strings.append(f'{key}={val_str}')
             kwargs_str = ', '.join(kwarg_strings)
 
-        # If it's not the last action
-        action_call_idx = self.TLA_calls.index(action_call)
-        next_idx = action_call_idx + 1
-
         # Get the time of the next call. If at the last - get the current
         # time (i.e. the time of closing)
-        if next_idx < len(self.TLA_calls):
-            next_start_time = self.TLA_calls[next_idx].start_time
+        calls = self.TLA_calls
+        next_idx = action_call_idx + 1
+        if next_idx < len(calls):
+            next_start_time = calls[next_idx].start_time
         else:
             next_start_time = time.time()
 
@@ -136,18 +216,19 @@ class ActionCamera:
         return action_call_code
 
     def generate_code_for_recording(self, *args):
-        action_call_code_chunks = []
-        for action_call in self.TLA_calls:
-            action_call_code = self.generate_code_for_action_call(action_call)
-            action_call_code_chunks.append(action_call_code)
-
-        import_strings = []
-        for class_used in self.classes_used:
-            import_strings.append(
-                f'from {class_used.__module__} import {class_used.__name__}')
-
-        imports_str = "\n".join(import_strings)
-        code_str = '\n\n'.join(action_call_code_chunks)
+        # The code must be generated before the imports, since it populates
+        # classes_used
+        code_buffer = io.StringIO()
+        for idx, action_call in enumerate(self.TLA_calls):
+            if idx:
+                code_buffer.write('\n\n')
+            code_buffer.write(
+                self.generate_code_for_action_call(action_call, idx))
+        code_str = code_buffer.getvalue()
+
+        imports_str = '\n'.join([
+            f'from {class_used.__module__} import {class_used.__name__}'
+            for class_used in self.classes_used])
         code_for_recording = f'''import pamet
 from fusion.visual_inspection.action_camera import exec_action
 from fusion import fsm
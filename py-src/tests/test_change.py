@@ -0,0 +1,85 @@
+from fusion.libs.entity import entity_type, Entity
+from fusion.libs.entity.change import Change
+
+
+@entity_type
+class MockChangeEntity(Entity):
+    text: str = ''
+    items: list = None
+
+
+def test_reversed():
+    old = MockChangeEntity(text='old', items=[1])
+    new = old.copy()
+    new.text = 'new'
+
+    create = Change.CREATE(old)
+    assert create.reversed().is_delete()
+    assert create.reversed().old_state is create.new_state
+
+    update = Change.UPDATE(old, new)
+    reversed_update = update.reversed()
+    assert reversed_update.is_update()
+    assert reversed_update.delta() == {'text': 'old'}
+
+    assert update.reversed().reversed().delta() == update.delta()
+    assert Change.DELETE(old).reversed().is_create()
+
+
+def test_added_and_removed():
+    old = MockChangeEntity(items=[1, 2, 3])
+    new = MockChangeEntity(id=old.id, items=[2, 3, 4, 5])
+    change = Change.UPDATE(old, new)
+
+    assert list(change.added.items) == [4, 5]
+    assert list(change.removed.items) == [1]
+    # Cached after the first access
+    assert change.added.items is change.added.items
+
+    # Unhashable items
+    old = MockChangeEntity(items=[[1], [2]])
+    new = MockChangeEntity(id=old.id, items=[[2], [3]])
+    change = Change.UPDATE(old, new)
+    assert list(change.added.items) == [[3]]
+    assert list(change.removed.items) == [[1]]
+
+
+def test_updated():
+    old = MockChangeEntity(text='old')
+    new = old.copy()
+    new.text = 'new'
+
+    update = Change.UPDATE(old, new)
+    assert update.updated.text
+    assert not update.updated.items
+
+    assert Change.CREATE(old).updated.text
+    assert not Change.DELETE(old).updated.text
+
+    assert set(update.changed_field_names()) == {'text'}
+    assert 'items' in Change.CREATE(old).changed_field_names()
+    assert not Change.DELETE(old).changed_field_names()
+
+
+def test_immutable_states_are_not_copied():
+    state = MockChangeEntity(text='text')
+    assert Change.CREATE(state).new_state is not state
+
+    # Immutability is enforced only in debug mode (the tests' default)
+    state.set_immutable()
+    assert Change.CREATE(state).new_state is state
+    assert Change.DELETE(state).old_state is state
+
+
+def test_safe_delta_dict_roundtrip():
+    old = MockChangeEntity(text='old')
+    new = old.copy()
+    new.text = 'new'
+
+    for change in (Change.CREATE(old), Change.UPDATE(old, new),
+                   Change.DELETE(old)):
+        loaded = Change.from_dict(change.as_safe_delta_dict())
+        assert loaded.change_type is change.change_type
+        assert loaded.old_state == change.old_state
+        assert loaded.new_state == change.new_state
+        assert loaded.timestamp == change.timestamp
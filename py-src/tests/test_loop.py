@@ -0,0 +1,18 @@
+from fusion.loop import NoMainLoop
+
+
+def test_no_main_loop_keeps_callbacks_until_due():
+    main_loop = NoMainLoop()
+    calls = []
+
+    def first():
+        calls.append('first')
+        main_loop.call_delayed(calls.append, args=['nested'])
+
+    main_loop.call_delayed(calls.append, 1000, args=['later'])
+    main_loop.call_delayed(first)
+    main_loop.call_delayed(calls.append, args=['second'])
+    main_loop.process_events()
+
+    assert calls == ['first', 'second', 'nested']
+    assert len(main_loop.callback_heap) == 1
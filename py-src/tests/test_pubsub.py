@@ -45,3 +45,70 @@ def test_pubsub():
 
     assert received_notes == expected_notes
     assert received_with_index_val_set == [expected_on_the_indexed_channel]
+
+
+def test_push_many_and_unsubscribe():
+    main_loop = NoMainLoop()
+    fusion.set_main_loop(main_loop)
+
+    channel = Channel('test_push_many_channel', index_key=lambda x: x % 3)
+
+    received_all = []
+    received_indexed = []
+    channel.subscribe(received_all.append)
+    indexed_sub = channel.subscribe(received_indexed.append, index_val=1)
+
+    channel.push_many(list(range(7)))
+    main_loop.process_events()
+
+    assert received_all == list(range(7))
+    assert received_indexed == [1, 4]
+
+    indexed_sub.unsubscribe()
+    channel.push(1)
+    main_loop.process_events()
+
+    assert received_all == list(range(7)) + [1]
+    assert received_indexed == [1, 4]
+
+
+def test_main_loop_swapped_with_a_pending_flush():
+    first_loop = NoMainLoop()
+    fusion.set_main_loop(first_loop)
+
+    channel = Channel('test_loop_swap_channel')
+    received = []
+    sub = channel.subscribe(received.append)
+
+    # The flush scheduled on the first loop never gets processed
+    channel.push('first')
+
+    second_loop = NoMainLoop()
+    fusion.set_main_loop(second_loop)
+    channel.push('second')
+    second_loop.process_events()
+
+    assert received == ['first', 'second']
+    sub.unsubscribe()
+
+
+def test_handlers_are_invoked_in_subscription_order():
+    main_loop = NoMainLoop()
+    fusion.set_main_loop(main_loop)
+
+    channel = Channel('test_order_channel', index_key=lambda x: x)
+    calls = []
+    subs = [
+        channel.subscribe(lambda m: calls.append('indexed'), index_val=1),
+        channel.subscribe(lambda m: calls.append('all')),
+        channel.subscribe(lambda m: calls.append('indexed again'),
+                          index_val=1),
+    ]
+
+    channel.push(1)
+    channel.push_many([1])
+    main_loop.process_events()
+
+    assert calls == ['indexed', 'all', 'indexed again'] * 2
+    for sub in subs:
+        sub.unsubscribe()
@@ -1,11 +1,14 @@
 from dataclasses import field
+import pytest
 import fusion
 from fusion import fsm
 from fusion.libs import action as actions_lib
+from fusion.libs.entity import Entity, entity_type
 from fusion.libs.action import action, wrapped_action_by_name
 from fusion.libs.action.action_call import ActionCall
 from fusion.libs.state import ViewState, view_state_type
 from fusion.loop import NoMainLoop
+from fusion.view import View
 
 
 def test_view_state_updates_and_diffing():
@@ -83,7 +86,7 @@ def test_view_state_updates_and_diffing():
 
     parent_state = create_view_state()
     subscription = fsm.state_changes_per_TLA_by_view_id.subscribe(
-        handle_state_change, index_val=parent_state.id)
+        handle_state_change, index_val=parent_state.view_id)
 
     main_loop.process_events()
     removed_child = remove_child(parent_state)
@@ -95,9 +98,136 @@ def test_view_state_updates_and_diffing():
         assert state.child_states == set(children_left)
 
     subscription.unsubscribe()
-    fsm.state_changes_per_TLA_by_view_id.subscribe(handle_state_change,
-                                                   index_val=parent_state.id)
+    fsm.state_changes_per_TLA_by_view_id.subscribe(
+        handle_state_change, index_val=parent_state.view_id)
     main_loop.process_events()
 
     assert completed_root_level_action_functions == \
         expected_top_level_action_functions
+
+
+@entity_type
+class MockLinkedEntity(Entity):
+    text: str = ''
+
+
+@view_state_type
+class MockTextViewState(ViewState):
+    text: str = ''
+    linked_entity: MockLinkedEntity = None
+
+
+@action('test_state_manager.add_state')
+def add_state(state):
+    return fsm.add_state(state)
+
+
+@action('test_state_manager.update_state')
+def update_state(state, **changes):
+    state.replace(**changes)
+    return fsm.update_state(state)
+
+
+@action('test_state_manager.remove_state')
+def remove_state(state):
+    return fsm.remove_state(state)
+
+
+@pytest.fixture
+def main_loop():
+    main_loop = NoMainLoop()
+    fusion.set_main_loop(main_loop)
+    yield main_loop
+    # Deliver the leftover changes, so they don't leak into other tests
+    main_loop.process_events()
+
+
+def test_noop_update_is_not_propagated(main_loop):
+    state = MockTextViewState()
+    add_state(state)
+    main_loop.process_events()
+
+    received = []
+    subscription = fsm.raw_state_changes.subscribe(received.append)
+
+    assert update_state(state) is None
+    main_loop.process_events()
+    assert received == []
+
+    change = update_state(state, text='changed')
+    assert change.delta() == {'text': 'changed'}
+    assert fsm.get_state_backup(state.view_id).text == 'changed'
+    main_loop.process_events()
+    assert received == [change]
+
+    # Entities are equal by id, but an entity with new contents is an update
+    linked_entity = MockLinkedEntity(text='old')
+    update_state(state, linked_entity=linked_entity)
+    new_linked_entity = MockLinkedEntity(id=linked_entity.id, text='new')
+    change = update_state(state, linked_entity=new_linked_entity)
+    assert change is not None
+    assert fsm.get_state_backup(state.view_id).linked_entity.text == 'new'
+
+    subscription.unsubscribe()
+
+
+def test_changes_are_aggregated_per_root_action(main_loop):
+
+    @action('test_aggregation.add_and_update')
+    def add_and_update(state, transient_state):
+        fsm.add_state(state)
+        for text in ['first', 'second']:
+            state.text = text
+            fsm.update_state(state)
+
+        fsm.add_state(transient_state)
+        fsm.remove_state(transient_state)
+
+    received = []
+    subscription = fsm.state_changes_per_TLA_by_view_id.subscribe(
+        received.append)
+
+    state = MockTextViewState()
+    transient_state = MockTextViewState()
+    add_and_update(state, transient_state)
+    main_loop.process_events()
+
+    # A single CREATE with the last state, nothing for the transient state
+    assert len(received) == 1
+    assert received[0].is_create()
+    assert received[0].last_state().text == 'second'
+
+    subscription.unsubscribe()
+
+
+def test_removed_state_is_readable_while_the_view_exists(main_loop):
+
+    @action('test_removed_state.add_and_remove')
+    def add_and_remove(state):
+        fsm.add_state(state)
+        fsm.remove_state(state)
+
+    state = MockTextViewState(text='removed')
+    view = View(state)
+    add_state(state)
+    remove_state(state)
+    main_loop.process_events()
+
+    # The view may still read its state before getting destroyed
+    assert view.state().text == 'removed'
+
+    del view
+    with pytest.raises(KeyError):
+        fsm.get_view_state_or_backup(state.view_id)
+
+    # Without a view no backups are kept
+    unviewed_state = MockTextViewState()
+    add_state(unviewed_state)
+    remove_state(unviewed_state)
+    transient_state = MockTextViewState()
+    add_and_remove(transient_state)
+    main_loop.process_events()
+
+    for removed_state in [unviewed_state, transient_state]:
+        with pytest.raises(KeyError):
+            fsm.get_state_backup(removed_state.view_id)